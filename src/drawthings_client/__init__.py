@@ -2,7 +2,10 @@
 Draw Things client library and CLI tool
 """
 
-from .client import DrawThingsClient, DrawThingsError, Txt2ImgParams, Lora
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .client import DrawThingsClient, DrawThingsError, Lora, Txt2ImgParams
 
 __version__ = "0.0.1"
 
@@ -14,3 +17,42 @@ __all__ = [
     "Lora",
     "__version__",
 ]
+
+# Names resolved lazily from the client module (PEP 562), so that importing the
+# package (e.g. for `drawthings --version`) does not load the HTTP/imaging stack
+_LAZY_CLIENT_ATTRS = {"DrawThingsClient", "DrawThingsError", "Txt2ImgParams", "Lora"}
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Resolve a public name lazily from the client module
+
+    The name is looked up in `.client` on first access and cached in `globals()`,
+    so later accesses do not go through this hook.
+
+    Args:
+        name: Attribute name
+
+    Returns:
+        Attribute of the client module
+
+    Raises:
+        AttributeError: If the name is not a lazily loaded attribute
+    """
+    if name in _LAZY_CLIENT_ATTRS:
+        from . import client
+
+        value = getattr(client, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    """
+    List the module attributes, including the not yet loaded client names
+
+    Returns:
+        Sorted attribute names
+    """
+    return sorted(set(globals()) | _LAZY_CLIENT_ATTRS)
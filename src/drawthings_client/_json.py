@@ -0,0 +1,54 @@
+"""
+JSON encoding/decoding shared by the client and the CLI
+"""
+
+import json
+from types import ModuleType
+from typing import Any
+
+orjson: ModuleType | None
+try:
+    import orjson  # type: ignore[import-not-found, no-redef]
+except ImportError:  # Optional dependency (installed with the "fast" extra)
+    orjson = None
+
+
+def json_loads(data: bytes | str) -> Any:
+    """
+    Decode a JSON document
+
+    Uses orjson when it is installed and falls back to the standard json module
+    (both accept bytes and raise ValueError on invalid input).
+
+    Args:
+        data: Encoded JSON document
+
+    Returns:
+        Decoded object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    Serialize an object to indented UTF-8 JSON
+
+    Uses orjson when it is installed and falls back to the standard json module.
+
+    Args:
+        obj: JSON-serializable object
+        sort_keys: Sort object keys (only worth it where output is read or diffed)
+
+    Returns:
+        Encoded JSON document
+    """
+    if orjson is not None:
+        options = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=options)
+    return json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=sort_keys).encode(
+        "utf-8"
+    )
@@ -2,19 +2,107 @@
 drawthings command line interface
 """
 
-import argparse
-import json
+import os
 import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
 
-from drawthings_client.client import DrawThingsClient, Txt2ImgParams
+if TYPE_CHECKING:
+    import argparse
 
+from ._json import json_dumps as _json_dumps
 from .lib.file_utils import FilePathGenerator
 
+# Leading bytes of every PNG file
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
 
-def create_parser() -> argparse.ArgumentParser:
+
+@dataclass(slots=True)
+class ParsedArgs:
+    """
+    Command line arguments recognized by `parse_argv`
+
+    Has the same attribute names as the argparse namespace, so the command
+    handlers accept either.
+    """
+
+    command: str
+    key: str | None = None
+    prompt: str | None = None
+    dir: str = "output"
+
+
+def parse_argv(argv: list[str]) -> ParsedArgs | None:
+    """
+    Parse the common command lines without argparse
+
+    Handles `config [KEY]` and `txt2img PROMPT [-d DIR]` with a single scan of
+    the arguments, so regular invocations do not import or build argparse.
+
+    Args:
+        argv: Command line arguments (without the program name)
+
+    Returns:
+        Parsed arguments, or None if argparse has to handle the command line
+        (help, unknown options, usage errors)
+    """
+    if not argv:
+        return None
+
+    command, rest = argv[0], argv[1:]
+    if any(arg == "--" or arg in ("-h", "--help") for arg in rest):
+        return None
+
+    if command == "config":
+        if not rest:
+            return ParsedArgs(command)
+        if len(rest) == 1 and not rest[0].startswith("-"):
+            return ParsedArgs(command, key=rest[0])
+        return None
+
+    if command == "txt2img":
+        args = ParsedArgs(command)
+        i = 0
+        while i < len(rest):
+            arg = rest[i]
+            if arg in ("-d", "--dir"):
+                if i + 1 >= len(rest) or rest[i + 1].startswith("-"):
+                    return None
+                args.dir = rest[i + 1]
+                i += 1
+            elif arg.startswith("--dir="):
+                args.dir = arg[len("--dir=") :]
+            elif arg.startswith("-d") and not arg.startswith("--"):
+                # "-dDIR" or "-d=DIR", like argparse
+                value = arg[len("-d") :]
+                args.dir = value[1:] if value.startswith("=") else value
+            elif arg.startswith("-") or args.prompt is not None:
+                return None
+            else:
+                args.prompt = arg
+            i += 1
+        return args if args.prompt is not None else None
+
+    return None
+
+
+def create_parser(argv: list[str] | None = None) -> "argparse.ArgumentParser":
     """
     Create command line argument parser for Draw Things CLI
+
+    Subparsers are built on demand: only the one matching the requested
+    command is constructed, so `--version` or `<command> --help` do not pay for
+    the others. Top-level help (or an unknown command) builds all of them.
+
+    Args:
+        argv: Command line arguments to be parsed (default: sys.argv[1:])
+
+    Returns:
+        Configured argument parser
     """
+    import argparse
+
     from . import __version__
 
     parser = argparse.ArgumentParser(
@@ -37,62 +125,137 @@ Examples:
 
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
-    # Subcommand for getting configuration
-    config_parser = subparsers.add_parser(
-        "config", help="Get configuration values from Draw Things app"
-    )
-    config_parser.add_argument(
-        "key",
-        nargs="?",
-        help="Configuration key to retrieve (if not specified, shows all config)",
-    )
-
-    # Subcommand for generating images from text
-    txt2img_parser = subparsers.add_parser(
-        "txt2img", help="Generate image from text using Draw Things app"
-    )
-    txt2img_parser.add_argument("prompt", help="Text prompt to generate image")
-    txt2img_parser.add_argument(
-        "-d",
-        "--dir",
-        default="output",
-        help="Output directory for generated images (default: output)",
-    )
+    # Options shared by every subcommand (none yet) should be defined once on a
+    # parent parser attached via `parents=`, rather than re-added to each
+    # subparser. Keep top-level flags such as --version on `parser` only: every
+    # extra option string makes argparse's option scanning slower, which was
+    # quadratic in the number of arguments before CPython gh-116162.
+
+    def p_config() -> None:
+        """Subcommand for getting configuration"""
+        config_parser = subparsers.add_parser(
+            "config",
+            help="Get configuration values from Draw Things app",
+        )
+        config_parser.add_argument(
+            "key",
+            nargs="?",
+            help="Configuration key to retrieve (if not specified, shows all config)",
+        )
+
+    def p_txt2img() -> None:
+        """Subcommand for generating images from text"""
+        txt2img_parser = subparsers.add_parser(
+            "txt2img",
+            help="Generate image from text using Draw Things app",
+        )
+        txt2img_parser.add_argument("prompt", help="Text prompt to generate image")
+        txt2img_parser.add_argument(
+            "-d",
+            "--dir",
+            default="output",
+            help="Output directory for generated images (default: output)",
+        )
+
+    builders = {"config": p_config, "txt2img": p_txt2img}
+
+    if argv is None:
+        argv = sys.argv[1:]
+    first_arg = argv[0] if argv else None
+
+    if first_arg in builders:
+        builders[first_arg]()
+    elif first_arg != "--version":
+        # Top-level help, no command, or an unknown one: list every command
+        for build in builders.values():
+            build()
 
     return parser
 
 
-def cmd_txt2img(args: argparse.Namespace) -> int:
+def _write_stdout(blob: bytes) -> None:
     """
-    Executes the txt2img command to generate images from text using the Draw Things app."""
+    Write an encoded document and a newline to stdout in one go
 
-    try:
-        client = DrawThingsClient()
+    Bypasses the text layer (and its encoding step) when stdout has a binary
+    buffer, falling back to print() otherwise (e.g. when stdout is replaced).
 
-        # Create txt2img request
-        request = Txt2ImgParams(prompt=args.prompt)
-        print(f"Generating image with parameters: {request.to_json()}")
-        print("Please wait...")
+    Args:
+        blob: UTF-8 encoded text
+    """
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        print(blob.decode("utf-8"))
+        return
+    # Keep ordering with anything already written through the text layer
+    sys.stdout.flush()
+    buffer.write(blob + b"\n")
+    buffer.flush()
 
-        path_gen = FilePathGenerator(args.dir)
-        image_count = 0
-        for image, config in client.txt2img(request):
-            image_count += 1
 
-            image_path = path_gen.create_image_path(image_count)
-            image.save(image_path)
-            print(f"Image saved to: {image_path}")
+def _save_png(image_data: bytes, image_path: str) -> None:
+    """
+    Save encoded image data (as returned by the txt2img API) as a PNG file
 
-            config_path = path_gen.create_config_path(image_count)
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=2, ensure_ascii=False, sort_keys=True)
-            print(f"Configuration saved to: {config_path}")
+    PNG data is written as is, without decoding it; other formats are converted
+    with PIL.
 
-        if image_count == 0:
-            print("No images were generated")
-            return 1
+    Args:
+        image_data: Encoded image data
+        image_path: Path of the PNG file to write
+    """
+    if image_data.startswith(_PNG_SIGNATURE):
+        Path(image_path).write_bytes(image_data)
+        return
+
+    from io import BytesIO
+
+    from PIL import Image
+
+    with Image.open(BytesIO(image_data)) as image:
+        image.save(image_path, "PNG")
+
+
+def cmd_txt2img(args: "argparse.Namespace | ParsedArgs") -> int:
+    """
+    Executes the txt2img command to generate images from text using the Draw Things app."""
+    from .client import DrawThingsClient, Txt2ImgParams
+
+    if args.prompt is None:
+        print("Error: a prompt is required", file=sys.stderr)
+        return 1
+
+    try:
+        with DrawThingsClient() as client:
+            # Create txt2img request (with a fixed seed, so the parameters shown
+            # below are the ones actually sent)
+            request = Txt2ImgParams(prompt=args.prompt).materialize()
+            print(f"Generating image with parameters: {request.to_json()}")
+            print("Please wait...")
+
+            path_gen = FilePathGenerator(args.dir)
+            image_count = 0
+            # All images of one txt2img call share the same config, so encode it once
+            config_blob: bytes | None = None
+            for image_data, config in client.txt2img_bytes(request):
+                image_count += 1
+
+                image_path = path_gen.create_image_path(image_count)
+                _save_png(image_data, image_path)
+                print(f"Image saved to: {image_path}")
+
+                if config_blob is None:
+                    config_blob = _json_dumps(config)
+                config_path = path_gen.create_config_path(image_count)
+                # Single write of the whole pre-encoded document
+                Path(config_path).write_bytes(config_blob)
+                print(f"Configuration saved to: {config_path}")
+
+            if image_count == 0:
+                print("No images were generated")
+                return 1
 
-        print(f"\nGenerated {image_count} image(s)")
+            print(f"\nGenerated {image_count} image(s)")
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -101,25 +264,26 @@ def cmd_txt2img(args: argparse.Namespace) -> int:
     return 0
 
 
-def cmd_config(args: argparse.Namespace) -> int:
+def cmd_config(args: "argparse.Namespace | ParsedArgs") -> int:
     """
     Executes the config command to retrieve configuration values from the Draw Things app.
     """
+    from .client import DrawThingsClient
 
     try:
-        client = DrawThingsClient()
-        config = client.get_config()
+        with DrawThingsClient() as client:
+            config = client.get_config()
 
         if args.key:
             if args.key in config:
                 value = config.get(args.key)
-                print(json.dumps(value, indent=2, ensure_ascii=False, sort_keys=True))
+                _write_stdout(_json_dumps(value, sort_keys=True))
             else:
                 print(f"Key '{args.key}' not found in configuration", file=sys.stderr)
                 return 1
         else:
-            # Display as JSON format
-            print(json.dumps(config, indent=2, ensure_ascii=False, sort_keys=True))
+            # Display as JSON format (sorted so the output is easy to scan)
+            _write_stdout(_json_dumps(config, sort_keys=True))
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
@@ -129,12 +293,27 @@ def cmd_config(args: argparse.Namespace) -> int:
 
 
 def main(argv: list[str] | None = None) -> int:
-    parser = create_parser()
-    args = parser.parse_args(argv)
+    if argv is None:
+        argv = sys.argv[1:]
 
-    if not args.command:
-        parser.print_help()
-        return 1
+    if argv == ["--version"]:
+        from . import __version__
+
+        print(f"drawthings {__version__}")
+        return 0
+
+    # DRAWTHINGS_LEGACY_PARSER=1 forces the argparse parser for every command line
+    args: argparse.Namespace | ParsedArgs | None = None
+    if os.environ.get("DRAWTHINGS_LEGACY_PARSER") != "1":
+        args = parse_argv(argv)
+
+    if args is None:
+        parser = create_parser(argv)
+        args = parser.parse_args(argv)
+
+        if not args.command:
+            parser.print_help()
+            return 1
 
     try:
         if args.command == "config":
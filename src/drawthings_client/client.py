@@ -2,19 +2,52 @@
 Draw Things client for macOS
 """
 
-import base64
+import http.client
 import json
 import logging
 import random
-from dataclasses import dataclass
+import socket
+import threading
+import time
+from dataclasses import dataclass, fields, replace
 from io import BytesIO
-from typing import Any, Iterator
+from typing import TYPE_CHECKING, Any, ClassVar, Iterator
 
-import requests  # type: ignore
-from PIL import Image
+try:
+    # SIMD-accelerated drop-in for base64.b64decode ("fast" extra)
+    from pybase64 import b64decode as _b64decode  # type: ignore[import-not-found]
+except ImportError:
+    # Same behavior, but its (typeshed) signature differs from pybase64's
+    from base64 import b64decode as _b64decode  # type: ignore[assignment]
+
+from ._json import json_loads as _json_loads
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Note: `PIL` is imported inside the function that uses it so that importing this
+# module stays cheap (e.g. for `drawthings --version`).
 
 logger = logging.getLogger(__name__)
 
+# Exceptions raised by http.client on connection/protocol failures
+_HTTP_ERRORS = (OSError, http.client.HTTPException)
+
+# Random seeds are non-negative int32 values (0 to 2**31 - 1). The range is a power
+# of two, so getrandbits() yields it directly without randint()'s rejection sampling
+_SEED_BITS = 31
+
+# API endpoint paths
+_OPTIONS_PATH = "/sdapi/v1/options"
+_TXT2IMG_PATH = "/sdapi/v1/txt2img"
+
+# Request headers, shared by all requests (http.client does not modify them)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_NO_HEADERS: dict[str, str] = {}
+
+# Maximum number of idle keep-alive connections kept by a client
+_MAX_IDLE_CONNECTIONS = 4
+
 
 # Sentinel value to inherit server's current configuration (different from None)
 class _InheritType:
@@ -30,7 +63,7 @@ It is used to distinguish between parameters that are explicitly set to None and
 INHERIT = _InheritType()
 
 
-@dataclass
+@dataclass(slots=True)
 class Lora:
     """
     Represents a LoRA (Low-Rank Adaptation) configuration for Draw Things app.
@@ -57,7 +90,7 @@ class Lora:
         """
         Convert to dictionary format
         """
-        result = {"file": self.file, "weight": self.weight}
+        result: dict[str, Any] = {"file": self.file, "weight": self.weight}
 
         # Only include enabled key when it's False
         if not self.enabled:
@@ -69,10 +102,10 @@ class Lora:
         """
         Convert to JSON string format
         """
-        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False, sort_keys=True)
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Txt2ImgParams:
     """
     Represents a request for the txt2img API of Draw Things app.
@@ -97,29 +130,43 @@ class Txt2ImgParams:
     batch_size: int | _InheritType = INHERIT  # Number of images generated at once
     loras: list[Lora] | _InheritType = INHERIT
 
-    def to_dict(self) -> dict[str, Any]:
+    # Names of the request parameter fields (set right after the class definition)
+    _FIELDS: ClassVar[tuple[str, ...]]
+
+    def materialize(self) -> "Txt2ImgParams":
         """
-        Convert to dictionary format (excluding INHERIT values)
+        Return a copy of the parameters with a concrete seed
+
+        A seed of -1 is replaced with a random seed, so that every `to_dict()`
+        and `to_json()` call on the returned copy describes the same request.
+
+        Returns:
+            New Txt2ImgParams instance
         """
-        result = {}
+        if self.seed == Txt2ImgParams.DEFAULT_SEED:
+            return replace(self, seed=random.getrandbits(_SEED_BITS))
+        return replace(self)
 
-        for key, value in self.__dict__.items():
-            # Skip INHERIT values (parameters that should inherit server's current settings)
-            if value is INHERIT:
-                continue
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert to dictionary format (excluding INHERIT values)
 
-            # Skip loras field here as it's handled specially below
-            if key == "loras":
-                if value is INHERIT:
-                    continue
-                else:
-                    value = [lora.to_dict() for lora in value]
+        A seed of -1 is replaced with a new random seed on every call (the request
+        itself is never modified); use `materialize()` to fix it.
+        """
+        # Skip INHERIT values (parameters that should inherit server's current settings)
+        result = {
+            name: value
+            for name in Txt2ImgParams._FIELDS
+            if (value := getattr(self, name)) is not INHERIT
+        }
 
-            # If seed is -1, generate a random int32 seed
-            if key == "seed" and value == Txt2ImgParams.DEFAULT_SEED:
-                value = random.randint(0, 2**31 - 1)
+        if "loras" in result:
+            result["loras"] = [lora.to_dict() for lora in result["loras"]]
 
-            result[key] = value
+        # If seed is -1, generate a random non-negative int32 seed
+        if result.get("seed") == Txt2ImgParams.DEFAULT_SEED:
+            result["seed"] = random.getrandbits(_SEED_BITS)
 
         return result
 
@@ -127,8 +174,10 @@ class Txt2ImgParams:
         """
         Convert to JSON string format
         """
+        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False)
 
-        return json.dumps(self.to_dict(), indent=2, ensure_ascii=False, sort_keys=True)
+
+Txt2ImgParams._FIELDS = tuple(f.name for f in fields(Txt2ImgParams))
 
 
 class DrawThingsError(Exception):
@@ -138,25 +187,48 @@ class DrawThingsError(Exception):
 
 
 class DrawThingsClient:
-    """Draw Things app client"""
+    """Draw Things app client
+
+    Requests reuse a small pool of keep-alive connections (safe to share between
+    threads). Use it as a context manager, or call `close()`, to close the idle
+    pooled connections.
+    """
 
-    def __init__(self, host: str = "localhost", port: int = 7860) -> None:
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 7860,
+        config_ttl: float = 5.0,
+        check_connection: bool = False,
+    ) -> None:
         """Initialize Draw Things client
 
         Args:
             host: Draw Things app host (default: localhost)
             port: Draw Things app port (default: 7860)
+            config_ttl: Seconds to reuse a fetched server configuration
+                (default: 5.0, 0 disables caching)
+            check_connection: Probe the server right away instead of on the
+                first request (default: False)
 
         Raises:
-            DrawThingsError: If cannot connect to Draw Things app
+            DrawThingsError: If check_connection is True and cannot connect to
+                Draw Things app
         """
         self.host = host
         self.port = port
         self.base_url = f"http://{host}:{port}"
+        self.config_ttl = config_ttl
+        # (fetch time, configuration) of the last get_config() call
+        self._config_cache: tuple[float, dict[str, Any]] | None = None
+        self._config_lock = threading.Lock()
+        # Idle keep-alive connections, reused by subsequent requests
+        self._idle_conns: list[http.client.HTTPConnection] = []
+        self._idle_conns_lock = threading.Lock()
         logger.info(f"DrawThings client initialized: {self.base_url}")
 
-        # 接続確認
-        if not self._check_connection():
+        # 接続確認 (otherwise connection errors surface on the first request)
+        if check_connection and not self._check_connection():
             raise DrawThingsError(
                 f"Cannot connect to Draw Things server: {self.base_url}"
             )
@@ -165,85 +237,349 @@ class DrawThingsClient:
         """
         Check connection to Draw Things app (internal method)
 
+        Only opens a TCP connection (no HTTP request), which is then kept in the
+        pool for the first real request.
+
         Returns:
             bool: True if connection is successful, False otherwise
         """
-        try:
-            url = f"{self.base_url}/sdapi/v1/options"
-            response = requests.get(url, timeout=3)
-            return response.status_code == 200
-        except requests.exceptions.RequestException:
-            return False
+        conn = self._acquire_connection(timeout=3)
+        if conn.sock is None:
+            try:
+                conn.connect()
+            except OSError:
+                conn.close()
+                return False
+        self._release_connection(conn)
+        return True
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: bytes | None = None,
+        timeout: float = 3,
+    ) -> tuple[bytes, str]:
+        """
+        Send an HTTP request to Draw Things app (internal method)
+
+        Args:
+            method: HTTP method (e.g. "GET", "POST")
+            path: Request path (e.g. "/sdapi/v1/options")
+            body: JSON-encoded request body, if any
+            timeout: Socket timeout in seconds
+
+        Returns:
+            Raw response body and its Content-Type
+
+        Raises:
+            DrawThingsError: If cannot connect to Draw Things app or the server
+                responds with a non-2xx status
+            OSError, http.client.HTTPException: On connection/protocol failures
+        """
+        headers = _JSON_HEADERS if body is not None else _NO_HEADERS
+
+        while True:
+            conn = self._acquire_connection(timeout)
+            reused = conn.sock is not None
+            if not reused:
+                try:
+                    conn.connect()
+                except OSError as e:
+                    conn.close()
+                    raise DrawThingsError(
+                        f"Cannot connect to Draw Things server: {self.base_url} ({e})"
+                    ) from e
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # The server may have dropped an idle kept-alive connection before
+                # it received the request: retry on another connection. Only GET is
+                # safe to resend, the server may already be processing a POST
+                # (i.e. generating images)
+                if not reused or method != "GET":
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+
+        self._release_connection(conn)
+
+        if not 200 <= response.status < 300:
+            raise DrawThingsError(
+                f"HTTP {response.status} {response.reason}: {method} {path}"
+            )
+        return data, response.getheader("Content-Type", "")
+
+    def _acquire_connection(self, timeout: float) -> http.client.HTTPConnection:
+        """
+        Take an idle connection from the pool or create a new one (internal method)
 
-    def get_config(self) -> dict[str, Any]:
+        Args:
+            timeout: Socket timeout in seconds for the next request
+
+        Returns:
+            HTTP connection to Draw Things app (not connected yet if new)
+        """
+        with self._idle_conns_lock:
+            conn = self._idle_conns.pop() if self._idle_conns else None
+
+        if conn is None:
+            return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+
+        conn.timeout = timeout
+        if conn.sock is not None:
+            if _is_connection_dropped(conn.sock):
+                # Reconnects on the next request
+                conn.close()
+            else:
+                conn.sock.settimeout(timeout)
+        return conn
+
+    def _release_connection(self, conn: http.client.HTTPConnection) -> None:
+        """
+        Return a connection to the pool for reuse (internal method)
+
+        Args:
+            conn: Connection whose response has been fully read
+        """
+        with self._idle_conns_lock:
+            if len(self._idle_conns) < _MAX_IDLE_CONNECTIONS:
+                self._idle_conns.append(conn)
+                return
+        conn.close()
+
+    def _get_json(self, path: str, timeout: float = 3) -> Any:
+        """
+        Send a GET request and decode the JSON response (internal method)
+        """
+        data, _ = self._request("GET", path, timeout=timeout)
+        return _json_loads(data)
+
+    def get_config(self, refresh: bool = False) -> dict[str, Any]:
         """Get configuration from Draw Things app
 
+        The result is cached for `config_ttl` seconds; call `invalidate_config()`
+        or pass `refresh=True` to fetch it again.
+
+        Args:
+            refresh: Ignore the cached configuration (default: False)
+
         Returns:
             Configuration dictionary
 
         Raises:
             DrawThingsError: If cannot connect to Draw Things app
         """
-        logger.info("Getting configuration from Draw Things app")
+        # Serialize fetches so that concurrent callers share a single request
+        with self._config_lock:
+            if self._config_cache is not None and not refresh:
+                fetched_at, config = self._config_cache
+                if time.monotonic() - fetched_at < self.config_ttl:
+                    return dict(config)
 
-        try:
-            url = f"{self.base_url}/sdapi/v1/options"
-            response = requests.get(url, timeout=3)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            raise DrawThingsError(f"Configuration retrieval error: {e}")
+            logger.info("Getting configuration from Draw Things app")
+
+            try:
+                config = self._get_json(_OPTIONS_PATH, timeout=3)
+            except (*_HTTP_ERRORS, ValueError, DrawThingsError) as e:
+                raise DrawThingsError(f"Configuration retrieval error: {e}") from e
+
+            self._config_cache = (time.monotonic(), config)
+            return dict(config)
+
+    def invalidate_config(self) -> None:
+        """Discard the cached server configuration"""
+        self._config_cache = None
 
     def txt2img(
-        self, request: Txt2ImgParams
-    ) -> Iterator[tuple[Image.Image, dict[str, Any]]]:
+        self,
+        request: Txt2ImgParams,
+        server_config: dict[str, Any] | None = None,
+        include_server_config: bool = True,
+    ) -> Iterator[tuple["Image.Image", dict[str, Any]]]:
         """
         Generate images from text using Draw Things txt2img API
 
         Args:
             request: Txt2ImgParams object with parameters
+            server_config: Server configuration to merge the parameters into, e.g.
+                from an earlier `get_config()` call (default: fetched/cached)
+            include_server_config: Merge the server configuration into the yielded
+                configuration. If False, only the request parameters are yielded
+                and the server configuration is not fetched (default: True)
+
+        Yields:
+            Tuple of (PIL.Image, dict) with generated image and configuration. The
+            image pixels are decoded on first use. The configuration dict is shared
+            by all images of the call; copy it before modifying it.
+        """
+        for image_data, config in self.txt2img_bytes(
+            request, server_config, include_server_config
+        ):
+            try:
+                image = _open_image(image_data)
+            except Exception as e:
+                raise DrawThingsError(f"Image processing error: {e}") from e
+            yield image, config
+
+    def txt2img_bytes(
+        self,
+        request: Txt2ImgParams,
+        server_config: dict[str, Any] | None = None,
+        include_server_config: bool = True,
+    ) -> Iterator[tuple[bytes, dict[str, Any]]]:
+        """
+        Generate images like `txt2img`, yielding the encoded image data
+
+        Use it to write the images to files as is (e.g. PNG data to a ".png"
+        file) without decoding them.
+
+        Both the usual JSON response (base64-encoded images) and a raw `image/*`
+        response body are supported.
+
+        Args:
+            request: Txt2ImgParams object with parameters
+            server_config: Same as for `txt2img`
+            include_server_config: Same as for `txt2img`
 
         Yields:
-            Tuple of (PIL.Image, dict) with generated image and configuration
+            Tuple of (bytes, dict) with encoded image data (e.g. PNG) and
+            configuration
         """
-        url = f"{self.base_url}/sdapi/v1/txt2img"
         payload = request.to_dict()
         # logger.debug(f"txt2img options: {payload}")
 
         try:
-            # This merges the server configuration with the request parameters
-            server_config = self.get_config()
-            merged_config = {**server_config, **payload}
+            if include_server_config and server_config is None:
+                # Fetched before the POST (not while the images are generated): the
+                # server may handle only one request at a time. Cached for config_ttl
+                server_config = self.get_config()
 
             # Call the API
-            response = requests.post(url, json=payload, timeout=600)
-            response.raise_for_status()
-            result = response.json()
-
-            if "images" in result and result["images"]:
-                # Yield each image in the response
-                for image_base64 in result["images"]:
-                    image_data = base64.b64decode(image_base64)
-                    image = Image.open(BytesIO(image_data))
-                    yield image, merged_config
-            else:
-                raise DrawThingsError(f"No images returned in response: {result}")
+            body = json.dumps(payload).encode("utf-8")
+            data, content_type = self._request(
+                "POST", _TXT2IMG_PATH, body=body, timeout=600
+            )
 
-        except requests.exceptions.RequestException as e:
-            raise DrawThingsError(f"API call error: {e}")
+            raw_image = content_type.startswith("image/")
+            if not raw_image:
+                result = _json_loads(data)
+                # Release the encoded body and the rest of the response right away;
+                # only the base64 image strings are needed from here on
+                del data
+                if not result.get("images"):
+                    raise DrawThingsError(f"No images returned in response: {result}")
+                images = result.pop("images")
+                del result
+
+            # Build the configuration only once images are known to be returned
+            if include_server_config and server_config is not None:
+                # This merges the server configuration with the request parameters
+                merged_config = {**server_config, **payload}
+            else:
+                merged_config = payload
+
+            if raw_image:
+                # Raw image body: no JSON parsing or base64 decoding needed
+                yield data, merged_config
+                return
+
+            # Yield each image in the response, popping each (large) base64 string
+            # so it can be freed as soon as it has been decoded
+            images.reverse()
+            while images:
+                yield _b64decode(images.pop(), validate=False), merged_config
+
+        except DrawThingsError:
+            raise
+        except _HTTP_ERRORS as e:
+            raise DrawThingsError(f"API call error: {e}") from e
         except Exception as e:
-            raise DrawThingsError(f"Image processing error: {e}")
+            raise DrawThingsError(f"Image processing error: {e}") from e
+
+    def close(self) -> None:
+        """Close the idle connections to Draw Things app"""
+        with self._idle_conns_lock:
+            conns, self._idle_conns = self._idle_conns, []
+        for conn in conns:
+            conn.close()
+
+    def __enter__(self) -> "DrawThingsClient":
+        """
+        Enter the runtime context (the client itself is used as is)
+
+        Returns:
+            This client
+        """
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """
+        Close the idle pooled connections when leaving the runtime context
+
+        Args:
+            exc_info: Exception type, value and traceback (not suppressed)
+        """
+        self.close()
 
     def __repr__(self) -> str:
         """String representation of the client"""
         return f"DrawThingsClient(host='{self.host}', port={self.port})"
 
 
+def _is_connection_dropped(sock: socket.socket) -> bool:
+    """
+    Check whether the server has closed an idle keep-alive connection
+
+    Peeks at the socket without blocking: an idle connection has nothing to read,
+    while a closed one reads EOF (or fails).
+
+    Args:
+        sock: Socket of an idle connection
+
+    Returns:
+        True if the connection cannot be used for another request
+    """
+    try:
+        sock.settimeout(0)
+        sock.recv(1, socket.MSG_PEEK)
+    except BlockingIOError:
+        return False
+    except OSError:
+        pass
+    # EOF, an error, or unexpected data (no response is due on an idle connection)
+    return True
+
+
+def _open_image(image_data: bytes) -> "Image.Image":
+    """
+    Open an encoded image (e.g. PNG data) returned by the txt2img API
+
+    Only the header is read here; PIL decodes the pixels on first use.
+
+    Args:
+        image_data: Encoded image data
+
+    Returns:
+        PIL image
+    """
+    from PIL import Image
+
+    return Image.open(BytesIO(image_data))
+
+
 def validate_dict_keys(dict1: dict, dict2: dict) -> None:
     """
     Validate that all keys in dict1 are present in dict2."""
-    invalid_keys = [key for key in dict1 if key not in dict2]
-    if invalid_keys:
+    # Set difference of the key views; only sorted (for a stable message) on failure
+    invalid = dict1.keys() - dict2.keys()
+    if invalid:
+        invalid_keys = sorted(invalid)
         logger.error(f"Invalid keys found: {invalid_keys}")
         raise DrawThingsError(
             f"Invalid keys in request: {', '.join(invalid_keys)}. "
@@ -0,0 +1,14 @@
+"""
+Helpers shared by the test modules
+"""
+
+import io
+
+from PIL import Image
+
+
+def create_image_bytes(format="PNG", color=(255, 0, 0), size=(4, 4)):
+    """Create encoded data (PNG by default) for a small test image"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format)
+    return buffer.getvalue()
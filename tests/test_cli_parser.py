@@ -0,0 +1,78 @@
+"""
+Tests for the command line parsers in cli.py
+
+This module checks that the fast parser (parse_argv) agrees with the argparse
+parser (create_parser) on every command line it accepts.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from drawthings_client.cli import create_parser, parse_argv
+
+
+# Command lines handled by parse_argv
+ACCEPTED_ARGVS = [
+    ["config"],
+    ["config", "model"],
+    ["txt2img", "a cat"],
+    ["txt2img", "a cat", "-d", "out"],
+    ["txt2img", "-d", "out", "a cat"],
+    ["txt2img", "a cat", "--dir", "out"],
+    ["txt2img", "a cat", "--dir=out"],
+    ["txt2img", "a cat", "--dir="],
+    ["txt2img", "a cat", "-dout"],
+    ["txt2img", "a cat", "-d=out"],
+    ["txt2img", "a cat", "-d="],
+    ["txt2img", "a cat", "-d==out"],
+    ["txt2img", "a cat", "-d", "="],
+    ["txt2img", "a cat", "-d", "a", "-d", "b"],
+    ["txt2img", ""],
+]
+
+# Command lines left to argparse (help, unknown options, usage errors)
+REJECTED_ARGVS = [
+    [],
+    ["--version"],
+    ["--help"],
+    ["unknown"],
+    ["config", "-h"],
+    ["config", "a", "b"],
+    ["config", "--", "model"],
+    ["txt2img"],
+    ["txt2img", "--help"],
+    ["txt2img", "a cat", "-d"],
+    ["txt2img", "a cat", "-d", "-x"],
+    ["txt2img", "a cat", "--di", "out"],
+    ["txt2img", "a cat", "-x"],
+    ["txt2img", "a", "b"],
+    ["txt2img", "-"],
+]
+
+
+class TestParseArgv(unittest.TestCase):
+    """Test cases for parse_argv function"""
+
+    def test_matches_argparse(self):
+        """Test that parse_argv gives the same values as the argparse parser"""
+        for argv in ACCEPTED_ARGVS:
+            with self.subTest(argv=argv):
+                args = parse_argv(argv)
+                self.assertIsNotNone(args)
+                
+                expected = vars(create_parser(argv).parse_args(argv))
+                actual = {name: getattr(args, name) for name in expected}
+                self.assertEqual(actual, expected)
+                
+    def test_falls_back_to_argparse(self):
+        """Test that parse_argv returns None for command lines it does not handle"""
+        for argv in REJECTED_ARGVS:
+            with self.subTest(argv=argv):
+                self.assertIsNone(parse_argv(argv))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for the txt2img command in cli.py
+
+The HTTP request is replaced with canned responses, so no server is needed.
+"""
+
+import base64
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from drawthings_client.cli import ParsedArgs, cmd_txt2img
+from drawthings_client.client import DrawThingsClient
+from tests.helpers import create_image_bytes
+
+
+def fake_request(image_data):
+    """Create a `_request` replacement answering with a txt2img JSON response"""
+
+    def request(self, method, path, body=None, timeout=3):
+        if method == "GET":
+            return json.dumps({"model": "test.ckpt"}).encode("utf-8"), "application/json"
+        images = [base64.b64encode(image_data).decode("ascii")]
+        return json.dumps({"images": images}).encode("utf-8"), "application/json"
+
+    return request
+
+
+class TestCmdTxt2Img(unittest.TestCase):
+    """Test cases for cmd_txt2img"""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        import shutil
+
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def run_txt2img(self, image_data):
+        """Run the txt2img command against a canned response"""
+        args = ParsedArgs("txt2img", prompt="a cat", dir=self.temp_dir)
+        with patch.object(DrawThingsClient, "_request", fake_request(image_data)):
+            with contextlib.redirect_stdout(io.StringIO()):
+                return cmd_txt2img(args)
+
+    def saved_files(self, extension):
+        """Return the files written to the output directory"""
+        return glob.glob(os.path.join(self.temp_dir, f"*{extension}"))
+
+    def test_png_written_as_is(self):
+        """Test that PNG data from the server is saved byte for byte"""
+        png_data = create_image_bytes()
+
+        self.assertEqual(self.run_txt2img(png_data), 0)
+
+        image_paths = self.saved_files(".png")
+        self.assertEqual(len(image_paths), 1)
+        with open(image_paths[0], "rb") as f:
+            self.assertEqual(f.read(), png_data)
+
+    def test_other_format_converted_to_png(self):
+        """Test that non-PNG data from the server is converted to PNG"""
+        jpeg_data = create_image_bytes("JPEG", (0, 0, 255))
+
+        self.assertEqual(self.run_txt2img(jpeg_data), 0)
+
+        image_paths = self.saved_files(".png")
+        self.assertEqual(len(image_paths), 1)
+        with Image.open(image_paths[0]) as saved:
+            self.assertEqual(saved.format, "PNG")
+            self.assertEqual(saved.size, (4, 4))
+
+    def test_config_saved_with_server_configuration(self):
+        """Test that the configuration file merges server and request parameters"""
+        self.assertEqual(self.run_txt2img(create_image_bytes()), 0)
+
+        config_paths = self.saved_files(".json")
+        self.assertEqual(len(config_paths), 1)
+        with open(config_paths[0], encoding="utf-8") as f:
+            config = json.load(f)
+        self.assertEqual(config["model"], "test.ckpt")
+        self.assertEqual(config["prompt"], "a cat")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,279 @@
+"""
+Tests for the HTTP layer of DrawThingsClient
+
+This module runs the client against a local http.server that mimics the Draw
+Things API: connection reuse, stale keep-alive connections, the configuration
+cache, raw image responses and error mapping.
+"""
+
+import base64
+import json
+import os
+import socket
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from drawthings_client.client import DrawThingsClient, DrawThingsError, Txt2ImgParams
+from tests.helpers import create_image_bytes
+
+
+class FakeDrawThingsHandler(BaseHTTPRequestHandler):
+    """Request handler mimicking the Draw Things API
+
+    The behaviour is configured through attributes of the server:
+    `drop_requests` holds the numbers (1-based, per method) of requests whose
+    connection is closed without a response, and `close_after_response` makes
+    the server close every connection after responding.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def send_body(self, body, content_type="application/json", status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.close_after_response:
+            # Closed without a "Connection: close" header, like an idle timeout
+            self.close_connection = True
+
+    def record(self):
+        """Record the request and tell whether its connection is to be dropped"""
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.path))
+            count = sum(1 for method, _ in server.requests if method == self.command)
+        if (self.command, count) in server.drop_requests:
+            self.close_connection = True
+            return True
+        return False
+
+    def do_GET(self):
+        if self.record():
+            return
+        if self.path == "/sdapi/v1/options":
+            self.send_body(json.dumps(self.server.config).encode("utf-8"))
+        else:
+            self.send_body(b'{"detail": "Not Found"}', status=404)
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        payload = json.loads(self.rfile.read(length))
+        if self.record():
+            return
+        if self.server.status != 200:
+            self.send_body(b"{}", status=self.server.status)
+        elif self.server.no_images:
+            self.send_body(b'{"images": []}')
+        elif self.server.raw_image:
+            self.send_body(create_image_bytes(), "image/png")
+        else:
+            images = [
+                base64.b64encode(create_image_bytes()).decode("ascii")
+                for _ in range(payload.get("batch_size", 1))
+            ]
+            self.send_body(json.dumps({"images": images}).encode("utf-8"))
+
+
+class FakeDrawThingsServer(ThreadingHTTPServer):
+    """Local HTTP server recording the requests it receives"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeDrawThingsHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.connections = 0
+        # Released each time the server has closed a connection
+        self.closed_connections = threading.Semaphore(0)
+        self.drop_requests = set()
+        self.close_after_response = False
+        self.config = {"model": "test.ckpt", "steps": 20}
+        self.status = 200
+        self.raw_image = False
+        self.no_images = False
+
+    def shutdown_request(self, request):
+        super().shutdown_request(request)
+        self.closed_connections.release()
+
+
+class TestDrawThingsClientHttp(unittest.TestCase):
+    """Test cases for DrawThingsClient against a local HTTP server"""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.server = FakeDrawThingsServer()
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.thread.start()
+        
+        self.client = DrawThingsClient("127.0.0.1", self.server.server_address[1])
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def requests_of(self, method):
+        """Return the paths of the requests received with the given method"""
+        return [path for m, path in self.server.requests if m == method]
+
+    def test_connection_is_reused(self):
+        """Test that consecutive requests share one keep-alive connection"""
+        for _ in range(3):
+            self.client.get_config(refresh=True)
+        list(self.client.txt2img(Txt2ImgParams(prompt="test")))
+        
+        # txt2img reuses the configuration fetched last
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_connection_closed_by_server_is_replaced(self):
+        """Test that an idle connection closed by the server is not used again"""
+        self.server.close_after_response = True
+        
+        self.client.get_config(refresh=True)
+        self.assertTrue(self.server.closed_connections.acquire(timeout=5))
+        images = list(self.client.txt2img(Txt2ImgParams(prompt="test")))
+        
+        self.assertEqual(len(images), 1)
+        self.assertEqual(len(self.requests_of("POST")), 1)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_get_is_retried_after_reset(self):
+        """Test that a GET dropped on a reused connection is sent again"""
+        self.server.drop_requests = {("GET", 2)}
+        
+        self.client.get_config(refresh=True)
+        config = self.client.get_config(refresh=True)
+        
+        self.assertEqual(config, self.server.config)
+        self.assertEqual(len(self.requests_of("GET")), 3)
+
+    def test_post_is_not_retried_after_reset(self):
+        """Test that a txt2img POST dropped on a reused connection is not resent"""
+        self.server.drop_requests = {("POST", 1)}
+        
+        self.client.get_config()
+        with self.assertRaises(DrawThingsError):
+            list(self.client.txt2img(Txt2ImgParams(prompt="test")))
+        
+        self.assertEqual(len(self.requests_of("POST")), 1)
+
+    def test_config_is_cached(self):
+        """Test that get_config reuses the configuration within config_ttl"""
+        self.client.get_config()
+        self.client.get_config()
+        list(self.client.txt2img(Txt2ImgParams(prompt="test")))
+        self.assertEqual(len(self.requests_of("GET")), 1)
+        
+        self.client.get_config(refresh=True)
+        self.assertEqual(len(self.requests_of("GET")), 2)
+        
+        self.client.invalidate_config()
+        self.client.get_config()
+        self.assertEqual(len(self.requests_of("GET")), 3)
+
+    def test_config_cache_disabled(self):
+        """Test that config_ttl=0 fetches the configuration on every call"""
+        self.client.config_ttl = 0
+        self.client.get_config()
+        self.client.get_config()
+        self.assertEqual(len(self.requests_of("GET")), 2)
+
+    def test_concurrent_get_config_fetches_once(self):
+        """Test that concurrent get_config calls share a single request"""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.client.get_config()))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(results, [self.server.config] * 8)
+        self.assertEqual(len(self.requests_of("GET")), 1)
+
+    def test_config_fetched_before_txt2img(self):
+        """Test that the configuration is fetched before the txt2img POST"""
+        results = list(self.client.txt2img(Txt2ImgParams(prompt="test", seed=1)))
+        
+        self.assertEqual(
+            self.server.requests,
+            [("GET", "/sdapi/v1/options"), ("POST", "/sdapi/v1/txt2img")],
+        )
+        config = results[0][1]
+        self.assertEqual(config["model"], "test.ckpt")
+        self.assertEqual(config["seed"], 1)
+
+    def test_batch_json_response(self):
+        """Test that every image of a JSON response is yielded"""
+        request = Txt2ImgParams(prompt="test", batch_size=3)
+        images = list(self.client.txt2img(request, include_server_config=False))
+        
+        self.assertEqual(len(images), 3)
+        self.assertEqual(self.requests_of("GET"), [])
+
+    def test_raw_image_response(self):
+        """Test that a raw image/png response is yielded as is"""
+        self.server.raw_image = True
+        
+        results = list(self.client.txt2img_bytes(Txt2ImgParams(prompt="test")))
+        
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0][0], create_image_bytes())
+
+    def test_no_images_in_response(self):
+        """Test that an empty image list raises DrawThingsError with the response"""
+        self.server.no_images = True
+        
+        with self.assertRaises(DrawThingsError) as cm:
+            list(self.client.txt2img(Txt2ImgParams(prompt="test")))
+        
+        self.assertIn("'images': []", str(cm.exception))
+
+    def test_http_error_status(self):
+        """Test that a non-2xx response raises DrawThingsError"""
+        self.server.status = 500
+        
+        with self.assertRaises(DrawThingsError) as cm:
+            list(self.client.txt2img(Txt2ImgParams(prompt="test")))
+        
+        self.assertIn("HTTP 500", str(cm.exception))
+
+    def test_connection_refused(self):
+        """Test that an unreachable server raises DrawThingsError"""
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        
+        client = DrawThingsClient("127.0.0.1", port)
+        with self.assertRaises(DrawThingsError) as cm:
+            client.get_config()
+        self.assertIn("Cannot connect", str(cm.exception))
+        
+        with self.assertRaises(DrawThingsError):
+            DrawThingsClient("127.0.0.1", port, check_connection=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Tests for the images yielded by DrawThingsClient.txt2img and txt2img_bytes
+
+The HTTP request is replaced with a canned response, so no server is needed.
+"""
+
+import base64
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from drawthings_client.client import DrawThingsClient, DrawThingsError, Txt2ImgParams
+from tests.helpers import create_image_bytes
+
+
+def json_response(images):
+    """Create a txt2img JSON response body for the given encoded images"""
+    body = {"images": [base64.b64encode(data).decode("ascii") for data in images]}
+    return json.dumps(body).encode("utf-8"), "application/json"
+
+
+class TestTxt2ImgImages(unittest.TestCase):
+    """Test cases for the images yielded by txt2img"""
+
+    def setUp(self):
+        """Set up test fixtures before each test method."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.client = DrawThingsClient()
+        self.request = Txt2ImgParams(prompt="test", seed=42)
+        self.png_data = create_image_bytes()
+
+    def tearDown(self):
+        """Clean up after each test method."""
+        import shutil
+
+        self.client.close()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def generate(self, response, method="txt2img"):
+        """Run txt2img (or txt2img_bytes) against a canned response"""
+        with patch.object(DrawThingsClient, "_request", return_value=response):
+            generator = getattr(self.client, method)
+            return list(generator(self.request, include_server_config=False))
+
+    def test_yields_pil_images(self):
+        """Test that txt2img yields regular PIL images"""
+        results = self.generate(json_response([self.png_data, create_image_bytes(color=(0, 0, 255))]))
+        
+        self.assertEqual(len(results), 2)
+        image, config = results[1]
+        self.assertIsInstance(image, Image.Image)
+        self.assertEqual(image.getpixel((0, 0)), (0, 0, 255))
+        self.assertEqual(config["seed"], 42)
+        
+        canvas = Image.new("RGB", (8, 8))
+        canvas.paste(image)
+        with image:
+            self.assertEqual(image.size, (4, 4))
+            
+    def test_modified_image_is_saved(self):
+        """Test that changes made to a yielded image are saved"""
+        image, _ = self.generate(json_response([self.png_data]))[0]
+        path = os.path.join(self.temp_dir, "image.png")
+        
+        image.thumbnail((2, 2))
+        image.save(path)
+        
+        with Image.open(path) as saved:
+            self.assertEqual(saved.size, (2, 2))
+            
+    def test_raw_image_response(self):
+        """Test that a raw image/png response body is yielded as one image"""
+        image, _ = self.generate((self.png_data, "image/png"))[0]
+        self.assertEqual(image.getpixel((0, 0)), (255, 0, 0))
+        
+    def test_corrupt_image_raises_drawthings_error(self):
+        """Test that undecodable image data raises DrawThingsError from txt2img"""
+        with self.assertRaises(DrawThingsError):
+            self.generate(json_response([b"not an image"]))
+            
+    def test_txt2img_bytes_does_not_decode(self):
+        """Test that txt2img_bytes yields the encoded data without Image.open"""
+        with patch("PIL.Image.open") as mock_open:
+            results = self.generate(json_response([self.png_data]), "txt2img_bytes")
+            mock_open.assert_not_called()
+            
+        image_data, config = results[0]
+        self.assertEqual(image_data, self.png_data)
+        self.assertEqual(config["prompt"], "test")
+
+
+if __name__ == "__main__":
+    unittest.main()
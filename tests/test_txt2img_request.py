@@ -11,7 +11,7 @@ from unittest.mock import patch
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from drawthings_client.client import Txt2ImgParams, INHERIT
+from drawthings_client.client import Txt2ImgParams, Lora, INHERIT
 
 
 class TestTxt2ImgParams(unittest.TestCase):
@@ -24,8 +24,8 @@ class TestTxt2ImgParams(unittest.TestCase):
         request = Txt2ImgParams(prompt="test prompt")
         
         # Mock the random generation to get predictable results
-        with patch('drawthings_client.client.random.randint') as mock_randint:
-            mock_randint.return_value = 12345
+        with patch('drawthings_client.client.random.getrandbits') as mock_getrandbits:
+            mock_getrandbits.return_value = 12345
             result = request.to_dict()
         
         expected = {
@@ -45,8 +45,8 @@ class TestTxt2ImgParams(unittest.TestCase):
         )
         
         # Mock the random generation for seed=-1
-        with patch('drawthings_client.client.random.randint') as mock_randint:
-            mock_randint.return_value = 54321
+        with patch('drawthings_client.client.random.getrandbits') as mock_getrandbits:
+            mock_getrandbits.return_value = 54321
             result = request.to_dict()
         
         expected = {
@@ -69,8 +69,8 @@ class TestTxt2ImgParams(unittest.TestCase):
         )
         
         # Mock random for seed=-1 default
-        with patch('drawthings_client.client.random.randint') as mock_randint:
-            mock_randint.return_value = 77777
+        with patch('drawthings_client.client.random.getrandbits') as mock_getrandbits:
+            mock_getrandbits.return_value = 77777
             result = request.to_dict()
         
         expected = {
@@ -91,8 +91,8 @@ class TestTxt2ImgParams(unittest.TestCase):
         )
         
         # Mock random for seed=-1 default
-        with patch('drawthings_client.client.random.randint') as mock_randint:
-            mock_randint.return_value = 88888
+        with patch('drawthings_client.client.random.getrandbits') as mock_getrandbits:
+            mock_getrandbits.return_value = 88888
             result = request.to_dict()
         
         expected = {
@@ -112,8 +112,8 @@ class TestTxt2ImgParams(unittest.TestCase):
         request2 = Txt2ImgParams(prompt="test", negative_prompt="explicit value")
         
         # Mock random for both tests
-        with patch('drawthings_client.client.random.randint') as mock_randint:
-            mock_randint.return_value = 99999
+        with patch('drawthings_client.client.random.getrandbits') as mock_getrandbits:
+            mock_getrandbits.return_value = 99999
             result1 = request1.to_dict()
             result2 = request2.to_dict()
         
@@ -131,17 +131,35 @@ class TestTxt2ImgParams(unittest.TestCase):
         self.assertEqual(result1, expected1)
         self.assertEqual(result2, expected2)
         
-    @patch('drawthings_client.client.random.randint')
-    def test_seed_random_generation(self, mock_randint):
+    @patch('drawthings_client.client.random.getrandbits')
+    def test_seed_random_generation(self, mock_getrandbits):
         """Test that seed=-1 generates random seed"""
-        mock_randint.return_value = 12345
+        mock_getrandbits.return_value = 12345
         
         request = Txt2ImgParams(prompt="test", seed=-1)
         result = request.to_dict()
         
         # Seed should be replaced with random value
         self.assertEqual(result["seed"], 12345)
-        mock_randint.assert_called_once_with(0, 2**31 - 1)
+        mock_getrandbits.assert_called_once_with(31)
+        
+    def test_to_dict_does_not_mutate_seed(self):
+        """Test that to_dict() resolves seed=-1 without modifying the request"""
+        request = Txt2ImgParams(prompt="test", seed=-1)
+        
+        with patch('drawthings_client.client.random.getrandbits') as mock_getrandbits:
+            mock_getrandbits.side_effect = [111, 222]
+            first = request.to_dict()
+            second = request.to_dict()
+        
+        # Each call draws a fresh seed and the request itself keeps seed=-1
+        self.assertEqual(first["seed"], 111)
+        self.assertEqual(second["seed"], 222)
+        self.assertEqual(request.seed, -1)
+        
+        # A materialized request serializes identically on every call
+        materialized = request.materialize()
+        self.assertEqual(materialized.to_dict(), materialized.to_dict())
         
     def test_seed_specific_value_preserved(self):
         """Test that specific seed values are preserved"""
@@ -190,6 +208,47 @@ class TestTxt2ImgParams(unittest.TestCase):
         self.assertIs(request.width, INHERIT)
         self.assertIs(request.height, INHERIT)
         self.assertIs(request.sampler, INHERIT)
+        
+    def test_to_dict_reflects_field_changes(self):
+        """Test that reassigning a field is reflected in the next to_dict() output"""
+        request = Txt2ImgParams(prompt="test", seed=42)
+        self.assertEqual(request.to_dict()["prompt"], "test")
+        
+        request.prompt = "changed"
+        request.width = 640
+        result = request.to_dict()
+        
+        self.assertEqual(result["prompt"], "changed")
+        self.assertEqual(result["width"], 640)
+        
+    def test_to_dict_reflects_in_place_lora_changes(self):
+        """Test that in-place changes to loras are sent by the next to_dict()"""
+        request = Txt2ImgParams(prompt="test", seed=42, loras=[Lora("a.safetensors")])
+        self.assertEqual(request.to_dict()["loras"], [{"file": "a.safetensors", "weight": 1.0}])
+        
+        request.loras[0].weight = 0.5
+        request.loras.append(Lora("b.safetensors", enabled=False))
+        result = request.to_dict()
+        
+        self.assertEqual(result["loras"], [
+            {"file": "a.safetensors", "weight": 0.5},
+            {"file": "b.safetensors", "weight": 1.0, "enabled": False},
+        ])
+        self.assertIn('"weight": 0.5', request.to_json())
+        
+    def test_materialize_fixes_random_seed(self):
+        """Test that materialize() resolves seed=-1 once for all serializations"""
+        request = Txt2ImgParams(prompt="test", seed=-1)
+        
+        with patch('drawthings_client.client.random.getrandbits') as mock_getrandbits:
+            mock_getrandbits.return_value = 24680
+            materialized = request.materialize()
+        
+        # The original request is left untouched
+        self.assertEqual(request.seed, -1)
+        self.assertEqual(materialized.seed, 24680)
+        self.assertEqual(materialized.to_dict(), materialized.to_dict())
+        self.assertIn('"seed": 24680', materialized.to_json())
 
 
 if __name__ == "__main__":